@@ -5,17 +5,31 @@ Dengan Auto-Refresh dari Google Drive + Backup Lokal
 """
 
 import dash
-from dash import dcc, html, Input, Output, State
+from dash import dcc, html, dash_table, ctx, Input, Output, State
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
-import calendar
+import base64
+import collections
+import functools
+import hashlib
 import io
-import requests
 import os
+import tempfile
+import threading
 import logging
 
+# Copy-on-Write: slice/derivasi DataFrame tidak menyalin data sampai ditulis
+pd.options.mode.copy_on_write = True
+
+# Serialisasi JSON Dash/Plotly lewat orjson jika tersedia
+try:
+    import orjson  # noqa: F401
+    import plotly.io as pio
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -28,30 +42,102 @@ GOOGLE_DRIVE_URL = "https://drive.google.com/file/d/1TBu_i7ZNxFRUddJkbndNVjjygaO
 USE_GOOGLE_DRIVE = True  
 REFRESH_INTERVAL = 5 * 60 * 1000 
 
-# Nama file backup lokal
+# Nama file backup lokal (Excel hanya dibaca sebagai backup lama)
 BACKUP_FILE = "kalpem_backup.xlsx"
 CSV_BACKUP = "kalpem_backup.csv"
 
+# Engine parser Excel: calamine (Rust) jika tersedia, fallback ke openpyxl
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Engine writer Excel untuk ekspor: xlsxwriter jika tersedia, fallback ke openpyxl
+try:
+    import xlsxwriter.workbook
+    EXPORT_ENGINE = 'xlsxwriter'
+    # Deflate level 1: ukuran file hampir sama, CPU kompresi jauh lebih ringan
+    xlsxwriter.workbook.ZipFile = functools.partial(xlsxwriter.workbook.ZipFile, compresslevel=1)
+except ImportError:
+    EXPORT_ENGINE = 'openpyxl'
+
+def read_excel_file(source):
+    """Baca file Excel dengan engine tercepat yang tersedia"""
+    if EXCEL_ENGINE == 'calamine':
+        return pd.read_excel(source, engine='calamine')
+
+    # Mode read_only: stream baris tanpa memuat style/format workbook
+    import openpyxl
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        return pd.DataFrame(rows, columns=header)
+    finally:
+        wb.close()
+
+# Session HTTP persisten (keep-alive) untuk refresh berkala
+_SESSION = None
+
+def get_session():
+    """Session HTTP bersama, dibuat (dan requests di-import) saat pertama dipakai"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+    return _SESSION
+
+# Cache conditional GET (ETag) dari download terakhir
+_last_etag = None
+_cached_df = None
+
 def download_from_google_drive():
     """Download Excel dari Google Drive (public link)"""
+    global _last_etag, _cached_df
     try:
         logger.info(f"[{datetime.now().strftime('%H:%M:%S')}] Mengambil data dari Google Drive...")
         
-        # Download file from gd
-        response = requests.get(GOOGLE_DRIVE_URL, timeout=30)
-        response.raise_for_status() 
-        
-        # Baca ke BytesIO
-        content = io.BytesIO(response.content)
+        # Download file from gd (lewati jika file tidak berubah)
+        headers = {'If-None-Match': _last_etag} if _last_etag and _cached_df is not None else {}
+        with get_session().get(GOOGLE_DRIVE_URL, headers=headers, timeout=30, stream=True) as response:
+            if response.status_code == 304:
+                logger.info("File tidak berubah (304), memakai data terakhir")
+                return _cached_df, True
+            response.raise_for_status() 
+            
+            # Stream body ke BytesIO
+            content = io.BytesIO()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                content.write(chunk)
+            content.seek(0)
+            etag = response.headers.get('ETag')
         
         # Parse Excel
-        df = pd.read_excel(content, engine='openpyxl')
+        df = read_excel_file(content)
         
         logger.info(f"Berhasil! {len(df)} baris data")
         
-        # Simpan backup lokal
-        df.to_excel(BACKUP_FILE, index=False)
-        df.to_csv(CSV_BACKUP, index=False)
+        _last_etag = etag
+        _cached_df = df
+        
+        # Simpan backup lokal (CSV, ditulis atomik via file sementara unik,
+        # aman bila beberapa proses menulis bersamaan)
+        try:
+            backup_dir = os.path.dirname(os.path.abspath(CSV_BACKUP))
+            fd, tmp_backup = tempfile.mkstemp(dir=backup_dir, prefix='.kalpem_', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', newline='') as f:
+                    df.to_csv(f, index=False)
+                os.replace(tmp_backup, CSV_BACKUP)
+            except BaseException:
+                os.unlink(tmp_backup)
+                raise
+        except OSError as e:
+            # Gagal menulis backup tidak membatalkan data yang sudah berhasil diunduh
+            logger.warning("Gagal menyimpan backup CSV: %s", e)
         
         return df, True
         
@@ -60,15 +146,15 @@ def download_from_google_drive():
         print(" Menggunakan backup lokal...")
         
         try:
-            # Coba baca dari Excel backup
-            if os.path.exists(BACKUP_FILE):
-                df = pd.read_excel(BACKUP_FILE, engine='openpyxl')
-                print(f"Menggunakan backup Excel: {len(df)} baris")
-                return df, False
-            elif os.path.exists(CSV_BACKUP):
+            # Coba baca dari CSV backup, lalu Excel backup lama
+            if os.path.exists(CSV_BACKUP):
                 df = pd.read_csv(CSV_BACKUP)
                 print(f"Menggunakan backup CSV: {len(df)} baris")
                 return df, False
+            elif os.path.exists(BACKUP_FILE):
+                df = read_excel_file(BACKUP_FILE)
+                print(f"Menggunakan backup Excel: {len(df)} baris")
+                return df, False
             else:
                 # if no backup, gunakan file default
                 df = pd.read_csv("kalpem.csv", sep=",")
@@ -79,42 +165,54 @@ def download_from_google_drive():
             print(f"Error backup: {backup_error}")
             return pd.DataFrame(), False
 
-def parse_indonesian_date(date_str):
-    """Konversi tanggal Indonesia ke datetime"""
-    if pd.isna(date_str):
-        return pd.NaT
-    
-    month_map = {
-        'Januari': 'January', 'Februari': 'February', 'Maret': 'March',
-        'April': 'April', 'Mei': 'May', 'Juni': 'June',
-        'Juli': 'July', 'Agustus': 'August', 'September': 'September',
-        'Oktober': 'October', 'November': 'November', 'Desember': 'December'
-    }
-    
-    try:
-        parts = str(date_str).split()
-        if len(parts) >= 3:
-            day = parts[0]
-            month_ind = parts[1]
-            year = parts[2]
-            
-            if month_ind in month_map:
-                month_en = month_map[month_ind]
-                date_en = f"{day} {month_en} {year}"
-                return pd.to_datetime(date_en, format='%d %B %Y')
-    except:
-        pass
-    
-    return pd.to_datetime(date_str, errors='coerce')
+# Nama bulan Indonesia -> Inggris untuk parsing tanggal
+MONTH_MAP = {
+    'Januari': 'January', 'Februari': 'February', 'Maret': 'March',
+    'April': 'April', 'Mei': 'May', 'Juni': 'June',
+    'Juli': 'July', 'Agustus': 'August', 'September': 'September',
+    'Oktober': 'October', 'November': 'November', 'Desember': 'December'
+}
+
+# Urutan bulan
+bulan_urutan = [
+    'Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+    'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember'
+]
+
+# Kategori terurut Bulan_Indo (kode 0-11 = Januari-Desember)
+BULAN_KATEGORI = bulan_urutan + ['Tidak Diketahui']
+
+def parse_indonesian_date(series):
+    """Konversi kolom tanggal Indonesia ke datetime (vektorisasi)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    s = series.astype('string').str.strip()
+    for ind, en in MONTH_MAP.items():
+        s = s.str.replace(ind, en, regex=False)
+    # Hanya tiga token pertama (hari bulan tahun); sisa teks seperti "(online)" diabaikan
+    tiga_token = s.str.split().str[:3].str.join(' ')
+    parsed = pd.to_datetime(tiga_token, format='%d %B %Y', errors='coerce')
+
+    # Fallback untuk nilai dengan format lain (mis. datetime dari Excel),
+    # memakai teks yang nama bulannya sudah diterjemahkan
+    sisa = parsed.isna() & series.notna()
+    if sisa.any():
+        parsed[sisa] = pd.to_datetime(s[sisa].astype(str), format='mixed', errors='coerce')
+    return parsed
+
+# Kolom yang dipakai dashboard/ekspor (sisanya dibuang di process_data)
+KEEP_COLS = [
+    'NamaProgramPembelajaran', 'Mulai', 'Akhir', 'Metode', 'Penyelenggara',
+    'TotalPeserta', 'Jumlahkelas', 'Bulan_Indo', 'TotalJamlator',
+    'LevelEvaluasi', 'Tahun', 'Durasi'
+]
 
 def process_data(df):
     """Process dan cleaning data"""
     if df.empty:
         return df
     
-    # Buat copy untuk menghindai SettingWithCopyWarning
-    df = df.copy()
-    
     # Clean data
     df = df.dropna(how='all')
     
@@ -125,17 +223,14 @@ def process_data(df):
             df = df.drop(columns=[col])
     
     # Konversi tanggal
-    df['Mulai'] = df['Mulai'].apply(parse_indonesian_date)
-    df['Akhir'] = df['Akhir'].apply(parse_indonesian_date)
+    df['Mulai'] = parse_indonesian_date(df['Mulai'])
+    df['Akhir'] = parse_indonesian_date(df['Akhir'])
     
     # Ekstrak informasi
-    df['Bulan_Num'] = df['Mulai'].dt.month
-    df['Bulan_Indo'] = df['Mulai'].dt.month.apply(
-        lambda x: {
-            1: 'Januari', 2: 'Februari', 3: 'Maret', 4: 'April',
-            5: 'Mei', 6: 'Juni', 7: 'Juli', 8: 'Agustus',
-            9: 'September', 10: 'Oktober', 11: 'November', 12: 'Desember'
-        }.get(x, 'Tidak Diketahui') if pd.notna(x) else 'Tidak Diketahui'
+    bulan_idx = df['Mulai'].dt.month.fillna(0).astype('int8').to_numpy()
+    df['Bulan_Indo'] = pd.Categorical.from_codes(
+        np.where(bulan_idx == 0, len(bulan_urutan), bulan_idx - 1),
+        categories=BULAN_KATEGORI, ordered=True
     )
     
     df['Tahun'] = df['Mulai'].dt.year
@@ -145,28 +240,149 @@ def process_data(df):
     numeric_cols = ['TotalPeserta', 'TotalJamlator']
     for col in numeric_cols:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            df[col] = df[col].fillna(0)
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
+    
+    # Kolom filter/agregasi sebagai category (kode integer)
+    for col in ['Bulan_Indo', 'Metode', 'Penyelenggara', 'LevelEvaluasi']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
+    # Simpan hanya kolom yang dipakai callback; integer diperkecil, float tetap
+    # float64 (float32 muncul di ekspor sebagai 1.100000023841858)
+    df = df[[col for col in KEEP_COLS if col in df.columns]]
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
     
     return df
 
-print("Memuat data...")
+def df_to_store(df):
+    """Serialisasi DataFrame ke Feather/Arrow IPC (base64) untuk dcc.Store"""
+    buffer = io.BytesIO()
+    df.reset_index(drop=True).to_feather(buffer)
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def store_to_df(data):
+    """Baca kembali DataFrame dari payload dcc.Store"""
+    if not data:
+        return pd.DataFrame()
+    return pd.read_feather(io.BytesIO(base64.b64decode(data)))
+
+# DataFrame hasil decode per digest payload; hanya di sini payload di-decode
+_STORE_FRAMES = collections.OrderedDict()
+_STORE_FRAMES_MAX = 4
+_store_lock = threading.Lock()
+
+def store_key(data):
+    """Digest pendek payload data-store, dipakai sebagai key semua cache"""
+    key = hashlib.blake2b(data.encode(), digest_size=16).hexdigest() if data else ''
+    with _store_lock:
+        if key in _STORE_FRAMES:
+            _STORE_FRAMES.move_to_end(key)
+            return key
+    
+    # Decode di luar lock; payload tidak disimpan, hanya DataFrame-nya
+    df = store_to_df(data)
+    with _store_lock:
+        _STORE_FRAMES[key] = df
+        while len(_STORE_FRAMES) > _STORE_FRAMES_MAX:
+            _STORE_FRAMES.popitem(last=False)
+    return key
+
+def load_store(key):
+    """DataFrame untuk digest dari store_key() (jangan dimodifikasi)"""
+    with _store_lock:
+        return _STORE_FRAMES[key]
+
+# Kolom yang bisa difilter dari sidebar
+FILTER_COLS = ('Bulan_Indo', 'Penyelenggara', 'Metode')
+
+@functools.lru_cache(maxsize=4)
+def get_codes(key):
+    """Kode integer + kategori kolom filter, dihitung sekali per payload"""
+    df = load_store(key)
+    codes = {}
+    for col in FILTER_COLS:
+        if col in df.columns:
+            codes[col] = (df[col].cat.codes.to_numpy(), df[col].cat.categories)
+    return codes
 
-if USE_GOOGLE_DRIVE:
-    df, connection_ok = download_from_google_drive()
-else:
-    df = pd.read_csv("kalpem.csv", sep=",")
-    connection_ok = False
+def build_filter_mask(key, filters):
+    """Gabungkan mask filter aktif; None jika tidak ada filter"""
+    codes = get_codes(key)
+    picked = []
+    for col, values in filters.items():
+        if not values or col not in codes:
+            continue
+        col_codes, categories = codes[col]
+        # Tabel lookup per kode; slot terakhir (kode -1 / NaN) selalu False
+        lut = np.zeros(len(categories) + 1, dtype=bool)
+        lut[np.flatnonzero(categories.isin(list(values)))] = True
+        picked.append(lut[col_codes])
+    
+    if not picked:
+        return None
+    return functools.reduce(np.logical_and, picked)
 
-df = process_data(df)
+def load_data():
+    """Ambil data dari sumber aktif lalu proses"""
+    if USE_GOOGLE_DRIVE:
+        new_df, is_connected = download_from_google_drive()
+    else:
+        new_df = pd.read_csv("kalpem.csv", sep=",")
+        is_connected = False
+    return process_data(new_df), is_connected
+
+def dropdown_options(df, col):
+    """Opsi dropdown dari kategori kolom (sudah unik dan terurut)"""
+    if col not in df.columns:
+        return []
+    return [{"label": str(c), "value": c} for c in df[col].cat.categories]
+
+print("Memuat data...")
+
+df, connection_ok = load_data()
 
 print(f"Data berhasil dimuat: {len(df)} baris")
 
-# Urutan bulan
-bulan_urutan = [
-    'Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
-    'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember'
-]
+# Slot data terbaru; diisi thread refresher, dibaca callback refresh_data
+_latest_cond = threading.Condition()
+_latest = {
+    'data': df_to_store(df),
+    'penyelenggara_options': dropdown_options(df, 'Penyelenggara'),
+    'metode_options': dropdown_options(df, 'Metode'),
+    'ts': datetime.now().strftime('%H:%M:%S'),
+    'ok': connection_ok,
+    'error': None,
+    'version': 0
+}
+_refresh_wake = threading.Event()
+
+def _refresh_loop():
+    """Refresh data berkala di background (atau saat dibangunkan)"""
+    while True:
+        _refresh_wake.wait(REFRESH_INTERVAL / 1000)
+        _refresh_wake.clear()
+        try:
+            new_df, is_connected = load_data()
+            update = {
+                'data': df_to_store(new_df),
+                'penyelenggara_options': dropdown_options(new_df, 'Penyelenggara'),
+                'metode_options': dropdown_options(new_df, 'Metode'),
+                'ok': is_connected,
+                'error': None
+            }
+        except Exception as e:
+            print(f"Error refresh: {e}")
+            # Jika error, data lama tetap dipakai
+            update = {'error': str(e)}
+        update['ts'] = datetime.now().strftime('%H:%M:%S')
+        
+        with _latest_cond:
+            _latest.update(update)
+            _latest['version'] += 1
+            _latest_cond.notify_all()
+
+threading.Thread(target=_refresh_loop, name="data-refresher", daemon=True).start()
 
 # Data statistik
 total_pelatihan_all = len(df)
@@ -185,7 +401,7 @@ app.layout = html.Div([
     dcc.Store(id='theme-store', data='light'),
     
     # Data storage 
-    dcc.Store(id='data-store', data=df.to_dict('records')),
+    dcc.Store(id='data-store', data=_latest['data']),
     
     # Download store
     dcc.Download(id="download-excel"),
@@ -249,8 +465,7 @@ app.layout = html.Div([
                         html.Label("Pilih Unit Kerja:", className="filter-label"),
                         dcc.Dropdown(
                             id="penyelenggara-dropdown",
-                            options=[{"label": str(p), "value": str(p)} 
-                                     for p in sorted([str(x) for x in df['Penyelenggara'].dropna().unique()])],
+                            options=[],
                             placeholder="Semua penyelenggara...",
                             multi=True
                         )
@@ -267,8 +482,7 @@ app.layout = html.Div([
                         html.Label("Pilih Metode:", className="filter-label"),
                         dcc.Dropdown(
                             id="metode-dropdown",
-                            options=[{"label": str(m), "value": str(m)} 
-                                     for m in sorted([str(x) for x in df['Metode'].dropna().unique()])],
+                            options=[],
                             placeholder="Semua metode...",
                             multi=True
                         )
@@ -469,50 +683,50 @@ app.layout = html.Div([
     [Output('data-store', 'data'),
      Output('last-update', 'children'),
      Output('connection-status', 'children'),
-     Output('connection-status', 'style')],
+     Output('connection-status', 'style'),
+     Output('penyelenggara-dropdown', 'options'),
+     Output('metode-dropdown', 'options')],
     [Input('interval-refresh', 'n_intervals'),
      Input('manual-refresh-btn', 'n_clicks')]
 )
 def refresh_data(n_intervals, manual_clicks):
-    """Auto-refresh data dari Google Drive"""
-    try:
-        if USE_GOOGLE_DRIVE:
-            new_df, is_connected = download_from_google_drive()
-        else:
-            new_df = pd.read_csv("kalpem.csv", sep=",")
-            is_connected = False
-        
-        # Process data
-        new_df = process_data(new_df)
-        
-        # Status
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        
-        if is_connected:
-            status_text = "Online"
-            status_style = {"color": "#57c5b6", "fontWeight": "500"}
-        else:
-            status_text = "Offline (Use Backup File)"
-            status_style = {"color": "#f39c12", "fontWeight": "500"}
-        
-        return (
-            new_df.to_dict('records'), 
-            f"Update: {timestamp}", 
-            status_text,
-            status_style
-        )
-        
-    except Exception as e:
-        print(f"Error refresh: {e}")
-        
-        # Jika error, gunakan data yang ada
+    """Ambil data terbaru dari slot refresher background"""
+    if ctx.triggered_id == 'manual-refresh-btn':
+        # Bangunkan refresher dan tunggu hasil refresh berikutnya
+        with _latest_cond:
+            version = _latest['version']
+            _refresh_wake.set()
+            _latest_cond.wait_for(lambda: _latest['version'] > version, timeout=60)
+    
+    with _latest_cond:
+        latest = dict(_latest)
+    
+    if latest['error']:
         return (
-            df.to_dict('records'), 
-            f"⚠️ Error: {str(e)[:30]}", 
+            latest['data'], 
+            f"⚠️ Error: {latest['error'][:30]}", 
             "Error",
-            {"color": "#e74c3c", "fontWeight": "500"}
+            {"color": "#e74c3c", "fontWeight": "500"},
+            latest['penyelenggara_options'],
+            latest['metode_options']
         )
     
+    if latest['ok']:
+        status_text = "Online"
+        status_style = {"color": "#57c5b6", "fontWeight": "500"}
+    else:
+        status_text = "Offline (Use Backup File)"
+        status_style = {"color": "#f39c12", "fontWeight": "500"}
+    
+    return (
+        latest['data'], 
+        f"Update: {latest['ts']}", 
+        status_text,
+        status_style,
+        latest['penyelenggara_options'],
+        latest['metode_options']
+    )
+    
 @app.callback(
     [Output('theme-store', 'data'),
      Output('theme-switch', 'style')],
@@ -536,47 +750,38 @@ def toggle_theme(n_clicks, current_theme):
     
     return new_theme, switch_style
 
-@app.callback(
-    [
-        Output("total-pelatihan", "children"),
-        Output("total-peserta", "children"),
-        Output("e-learning-count", "children"),
-        Output("pjj-count", "children"),
-        Output("total-jamlator-count", "children"),
-        Output("filtered-count", "children"),
-        Output("avg-peserta", "children"),
-        Output("pelatihan-chart", "figure"),
-        Output("metode-chart", "figure"),
-        Output("penyelenggara-chart", "figure"),
-        Output("level-chart", "figure"),
-        Output("data-table", "children")
-    ],
-    [
-        Input("data-store", "data"),
-        Input("bulan-dropdown", "value"),
-        Input("penyelenggara-dropdown", "value"),
-        Input("metode-dropdown", "value")
-    ]
-)
-def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filter):
-    # Convert dari store ke DataFrame
-    filtered_df = pd.DataFrame(data_dict)
-    
-    # Apply filters
-    if bulan_filter:
-        filtered_df = filtered_df[filtered_df['Bulan_Indo'].isin(bulan_filter)]
-    
-    if penyelenggara_filter:
-        filtered_df = filtered_df[filtered_df['Penyelenggara'].astype(str).isin(penyelenggara_filter)]
+def filter_keys(bulan_filter, penyelenggara_filter, metode_filter):
+    """Nilai dropdown sebagai tuple terurut (hashable untuk key cache)"""
+    return tuple(
+        tuple(sorted(values)) if values else ()
+        for values in (bulan_filter, penyelenggara_filter, metode_filter)
+    )
+
+@functools.lru_cache(maxsize=16)
+def get_filtered(key, bulan, penyelenggara, metode):
+    """DataFrame tersaring per payload dan kombinasi filter (jangan dimodifikasi)"""
+    filtered_df = load_store(key)
     
-    if metode_filter:
-        filtered_df = filtered_df[filtered_df['Metode'].astype(str).isin(metode_filter)]
+    # Apply filters (mask di-cache per payload data-store)
+    mask = build_filter_mask(key, {
+        'Bulan_Indo': bulan,
+        'Penyelenggara': penyelenggara,
+        'Metode': metode
+    })
+    if mask is not None:
+        filtered_df = filtered_df.iloc[mask]
+    return filtered_df
+
+@functools.lru_cache(maxsize=16)
+def build_kpis(key, bulan, penyelenggara, metode):
+    """Nilai KPI untuk data tersaring"""
+    filtered_df = get_filtered(key, bulan, penyelenggara, metode)
     
     # KPI Calculations
     total_pelatihan = len(filtered_df)
     
+    # Kolom numerik sudah dikonversi di process_data
     if 'TotalPeserta' in filtered_df.columns:
-        filtered_df['TotalPeserta'] = pd.to_numeric(filtered_df['TotalPeserta'], errors='coerce')
         total_peserta = filtered_df['TotalPeserta'].sum()
         avg_peserta = filtered_df['TotalPeserta'].mean() if len(filtered_df) > 0 else 0
     else:
@@ -584,17 +789,34 @@ def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filte
         avg_peserta = 0
     
     if 'TotalJamlator' in filtered_df.columns:
-        filtered_df['TotalJamlator'] = pd.to_numeric(filtered_df['TotalJamlator'], errors='coerce')
         total_jamlator = filtered_df['TotalJamlator'].sum()
     else:
         total_jamlator = 0
     
-    e_learning_count = len(filtered_df[filtered_df['Metode'].astype(str) == 'E-Learning'])
-    pjj_count = len(filtered_df[filtered_df['Metode'].astype(str) == 'PJJ'])
+    e_learning_count = int((filtered_df['Metode'] == 'E-Learning').sum())
+    pjj_count = int((filtered_df['Metode'] == 'PJJ').sum())
+    
+    return (
+        f"{total_pelatihan}",
+        f"{int(total_peserta):,}",
+        f"{e_learning_count}",
+        f"{pjj_count}",
+        f"{int(total_jamlator):,}",
+        f"{total_pelatihan}",
+        f"{int(avg_peserta)}"
+    )
+
+@functools.lru_cache(maxsize=16)
+def build_bulan_chart(key, bulan, penyelenggara, metode):
+    """Chart 1: Pelatihan per Bulan"""
+    import plotly.express as px
+    
+    filtered_df = get_filtered(key, bulan, penyelenggara, metode)
     
-    # Chart 1: Pelatihan per Bulan
     if not filtered_df.empty:
-        bulan_counts = filtered_df['Bulan_Indo'].value_counts().reindex(bulan_urutan, fill_value=0).reset_index()
+        # Category terurut: hitungan sudah dalam urutan bulan
+        bulan_counts = (filtered_df.groupby('Bulan_Indo', observed=False).size()
+                        .iloc[:len(bulan_urutan)].reset_index())
         bulan_counts.columns = ['Bulan', 'Jumlah']
         
         fig1 = px.bar(
@@ -616,9 +838,18 @@ def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filte
         fig1 = px.bar(title='')
         fig1.update_layout(height=350)
     
-    # Chart 2: Distribusi Metode
+    return fig1
+
+@functools.lru_cache(maxsize=16)
+def build_metode_chart(key, bulan, penyelenggara, metode):
+    """Chart 2: Distribusi Metode"""
+    import plotly.express as px
+    
+    filtered_df = get_filtered(key, bulan, penyelenggara, metode)
+    
     if not filtered_df.empty:
-        metode_counts = filtered_df['Metode'].value_counts().reset_index()
+        metode_counts = (filtered_df.groupby('Metode', observed=True).size()
+                         .sort_values(ascending=False).reset_index())
         metode_counts.columns = ['Metode', 'Jumlah']
         
         fig2 = px.pie(
@@ -634,9 +865,18 @@ def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filte
         fig2 = px.pie(title='')
         fig2.update_layout(height=350)
     
-    # Chart 3: Top Penyelenggara
+    return fig2
+
+@functools.lru_cache(maxsize=16)
+def build_penyelenggara_chart(key, bulan, penyelenggara, metode):
+    """Chart 3: Top Penyelenggara"""
+    import plotly.express as px
+    
+    filtered_df = get_filtered(key, bulan, penyelenggara, metode)
+    
     if not filtered_df.empty:
-        penyelenggara_counts = filtered_df['Penyelenggara'].value_counts().head(10).reset_index()
+        penyelenggara_counts = (filtered_df.groupby('Penyelenggara', observed=True).size()
+                                .nlargest(10).reset_index())
         penyelenggara_counts.columns = ['Penyelenggara', 'Jumlah']
         
         fig3 = px.bar(
@@ -653,10 +893,22 @@ def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filte
         fig3 = px.bar(title='')
         fig3.update_layout(height=350)
     
-    # Chart 4: Level Evaluasi
+    return fig3
+
+@functools.lru_cache(maxsize=16)
+def build_level_chart(key, bulan, penyelenggara, metode):
+    """Chart 4: Level Evaluasi"""
+    import plotly.express as px
+    
+    filtered_df = get_filtered(key, bulan, penyelenggara, metode)
+    
     if not filtered_df.empty and 'LevelEvaluasi' in filtered_df.columns:
-        level_counts = filtered_df['LevelEvaluasi'].value_counts().reset_index()
+        level_counts = (filtered_df.groupby('LevelEvaluasi', observed=True).size()
+                        .sort_values(ascending=False).reset_index())
         level_counts.columns = ['Level', 'Jumlah']
+        # Nilai polos, bukan category: plotly mengelompokkan kolom color dan
+        # ikut menyertakan kategori yang tidak muncul (KeyError)
+        level_counts['Level'] = np.asarray(level_counts['Level'])
         
         fig4 = px.bar(
             level_counts,
@@ -672,7 +924,13 @@ def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filte
         fig4 = px.bar(title='')
         fig4.update_layout(height=350)
     
-    # Data Table
+    return fig4
+
+@functools.lru_cache(maxsize=16)
+def build_table(key, bulan, penyelenggara, metode):
+    """Tabel detail (15 baris pertama)"""
+    filtered_df = get_filtered(key, bulan, penyelenggara, metode)
+    
     if not filtered_df.empty:
         columns_to_show = [
             'NamaProgramPembelajaran', 'Mulai', 'Akhir', 
@@ -680,46 +938,42 @@ def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filte
         ]
         
         available_cols = [col for col in columns_to_show if col in filtered_df.columns]
-        table_data = filtered_df[available_cols].head(15)
+        # Potong ke 15 baris dulu agar hanya baris tampil yang diformat
+        table_data = filtered_df.head(15)[available_cols]
         
-        # Format table
-        table_header = [html.Tr([html.Th(col.replace('_', ' ')) for col in available_cols])]
-        table_rows = []
+        # Format kolom tanggal sekali per kolom; angka diformat di sisi klien
+        table_data = table_data.assign(**{
+            col: table_data[col].dt.strftime('%d %b %Y').fillna('')
+            for col in ('Mulai', 'Akhir') if col in available_cols
+        })
+        numeric_cols = ('TotalPeserta', 'TotalJamlator')
         
-        for _, row in table_data.iterrows():
-            row_cells = []
-            for col in available_cols:
-                value = row[col]
-                if pd.isna(value):
-                    value = ''
-                elif 'Mulai' in col or 'Akhir' in col:
-                    if pd.notna(value):
-                        try:
-                            value = pd.to_datetime(value).strftime('%d %b %Y')
-                        except:
-                            value = str(value)
-                    else:
-                        value = ''
-                elif 'TotalPeserta' in col or 'TotalJamlator' in col:
-                    try:
-                        value = f"{int(float(value)):,}"
-                    except:
-                        value = str(value)
-                else:
-                    value = str(value)
-                
-                cell_style = {
-                    "padding": "12px 15px",
-                    "borderBottom": "1px solid var(--border-color)",
-                    "color": "var(--text-color)"
-                }
-                row_cells.append(html.Td(value, style=cell_style))
-            
-            table_rows.append(html.Tr(row_cells))
-        
-        table = html.Table(
-            [html.Thead(table_header), html.Tbody(table_rows)],
-            className="data-table"
+        table = dash_table.DataTable(
+            data=table_data.to_dict('records'),
+            columns=[
+                {"name": col.replace('_', ' '), "id": col, "type": "numeric",
+                 "format": {"specifier": ",.0f"}}
+                if col in numeric_cols else
+                {"name": col.replace('_', ' '), "id": col}
+                for col in available_cols
+            ],
+            virtualization=True,
+            page_size=15,
+            fixed_rows={"headers": True},
+            style_table={"minWidth": "1000px"},
+            style_header={
+                "backgroundColor": "var(--primary-color)",
+                "color": "white",
+                "fontWeight": "600",
+                "padding": "15px 20px"
+            },
+            style_cell={
+                "padding": "12px 15px",
+                "textAlign": "left",
+                "borderBottom": "1px solid var(--border-color)",
+                "color": "var(--text-color)",
+                "backgroundColor": "transparent"
+            }
         )
     else:
         table = html.Div(
@@ -727,16 +981,50 @@ def update_dashboard(data_dict, bulan_filter, penyelenggara_filter, metode_filte
             style={"textAlign": "center", "padding": "40px", "color": "var(--text-light)"}
         )
     
-    return (
-        f"{total_pelatihan}",
-        f"{int(total_peserta):,}",
-        f"{e_learning_count}",
-        f"{pjj_count}",
-        f"{int(total_jamlator):,}",
-        f"{total_pelatihan}",
-        f"{int(avg_peserta)}",
-        fig1, fig2, fig3, fig4, table
-    )
+    return table
+
+# Input bersama semua callback dashboard
+DASHBOARD_INPUTS = [
+    Input("data-store", "data"),
+    Input("bulan-dropdown", "value"),
+    Input("penyelenggara-dropdown", "value"),
+    Input("metode-dropdown", "value")
+]
+
+@app.callback(
+    [
+        Output("total-pelatihan", "children"),
+        Output("total-peserta", "children"),
+        Output("e-learning-count", "children"),
+        Output("pjj-count", "children"),
+        Output("total-jamlator-count", "children"),
+        Output("filtered-count", "children"),
+        Output("avg-peserta", "children")
+    ],
+    DASHBOARD_INPUTS
+)
+def update_kpis(data_dict, bulan_filter, penyelenggara_filter, metode_filter):
+    return build_kpis(store_key(data_dict), *filter_keys(bulan_filter, penyelenggara_filter, metode_filter))
+
+@app.callback(Output("pelatihan-chart", "figure"), DASHBOARD_INPUTS)
+def update_bulan_chart(data_dict, bulan_filter, penyelenggara_filter, metode_filter):
+    return build_bulan_chart(store_key(data_dict), *filter_keys(bulan_filter, penyelenggara_filter, metode_filter))
+
+@app.callback(Output("metode-chart", "figure"), DASHBOARD_INPUTS)
+def update_metode_chart(data_dict, bulan_filter, penyelenggara_filter, metode_filter):
+    return build_metode_chart(store_key(data_dict), *filter_keys(bulan_filter, penyelenggara_filter, metode_filter))
+
+@app.callback(Output("penyelenggara-chart", "figure"), DASHBOARD_INPUTS)
+def update_penyelenggara_chart(data_dict, bulan_filter, penyelenggara_filter, metode_filter):
+    return build_penyelenggara_chart(store_key(data_dict), *filter_keys(bulan_filter, penyelenggara_filter, metode_filter))
+
+@app.callback(Output("level-chart", "figure"), DASHBOARD_INPUTS)
+def update_level_chart(data_dict, bulan_filter, penyelenggara_filter, metode_filter):
+    return build_level_chart(store_key(data_dict), *filter_keys(bulan_filter, penyelenggara_filter, metode_filter))
+
+@app.callback(Output("data-table", "children"), DASHBOARD_INPUTS)
+def update_table(data_dict, bulan_filter, penyelenggara_filter, metode_filter):
+    return build_table(store_key(data_dict), *filter_keys(bulan_filter, penyelenggara_filter, metode_filter))
 
 @app.callback(
     [
@@ -751,6 +1039,137 @@ def reset_filters(n_clicks):
         return [], [], []
     return dash.no_update, dash.no_update, dash.no_update
 
+@functools.lru_cache(maxsize=8)
+def build_export_bytes(key, bulan_filter, penyelenggara_filter, metode_filter):
+    """Bangun file Excel ekspor; di-cache per payload data-store dan filter (filter_keys)"""
+    df = load_store(key)
+    
+    if df.empty:
+        logger.info("DataFrame kosong")
+        return None
+    
+    # Pilih kolom untuk ekspor
+    column_order = [
+        'NamaProgramPembelajaran', 'Mulai', 'Akhir', 'Durasi',
+        'Metode', 'Penyelenggara', 'TotalPeserta', 'Jumlahkelas',
+        'Bulan_Indo', 'TotalJamlator', 'Tahun'
+    ]
+    
+    # Hanya ambil kolom yang ada (lookup lewat set, bukan scan Index)
+    df_cols = set(df.columns)
+    existing_cols = [col for col in column_order if col in df_cols]
+    cols_set = set(existing_cols)
+    
+    # Apply filter with same like dash (mask cache yang sama dengan dashboard)
+    mask = build_filter_mask(key, {
+        'Bulan_Indo': bulan_filter,
+        'Penyelenggara': penyelenggara_filter,
+        'Metode': metode_filter
+    })
+    
+    # Proyeksi kolom + filter baris dalam satu gather
+    if mask is not None:
+        df = df.loc[mask, existing_cols]
+    else:
+        df = df[existing_cols]
+    
+    logger.info("Data untuk ekspor: %d baris", len(df))
+    
+    # Format data (kolom baru dikumpulkan lalu dipasang sekali lewat assign)
+    new_cols = {}
+    # Tanggal (sudah datetime64 dari process_data; parse ulang hanya jika perlu)
+    for col in ['Mulai', 'Akhir']:
+        if col in cols_set:
+            tanggal = df[col]
+            if not pd.api.types.is_datetime64_any_dtype(tanggal):
+                tanggal = pd.to_datetime(tanggal, errors='coerce', cache=True)
+            new_cols[col] = tanggal.dt.strftime('%d/%m/%Y')
+    
+    # Numerik, dengan pemisah ribuan (versi angka disimpan untuk ringkasan)
+    numerik = {}
+    for col in ['TotalPeserta', 'TotalJamlator']:
+        if col in cols_set:
+            nilai = df[col]
+            # Sudah numerik dari process_data; parse ulang hanya jika perlu
+            if not pd.api.types.is_numeric_dtype(nilai):
+                nilai = pd.to_numeric(nilai, errors='coerce')
+            nilai = nilai.fillna(0).astype('int64')
+            numerik[col] = nilai
+            new_cols[col] = nilai.map("{:,}".format)
+    
+    df_export = df.assign(**new_cols)
+    
+    # Agregat ringkasan dari kolom numerik yang sudah dikonversi di atas
+    if 'TotalPeserta' in numerik:
+        peserta_sum = numerik['TotalPeserta'].sum()
+        peserta_mean = round(peserta_sum / len(df), 1) if len(df) else 0
+    else:
+        peserta_sum = peserta_mean = 0
+    
+    jam_sum = numerik['TotalJamlator'].sum() if 'TotalJamlator' in numerik else 0
+    
+    if 'Bulan_Indo' in cols_set and not df.empty:
+        bulan_terbanyak = df['Bulan_Indo'].value_counts(sort=False).idxmax()
+    else:
+        bulan_terbanyak = '-'
+    
+    # Buat Excel di memory
+    output = io.BytesIO()
+    
+    with pd.ExcelWriter(output, engine=EXPORT_ENGINE) as writer:
+        # Sheet 1: Data Pelatihan
+        df_export.to_excel(writer, sheet_name='Data Pelatihan', index=False)
+        
+        # Sheet 2: Ringkasan
+        summary_data = {
+            'Metrik': [
+                'Total Pelatihan',
+                'Total Peserta', 
+                'Total Jam Lator',
+                'Rata-rata Peserta per Pelatihan',
+                'Pelatihan Terbanyak di Bulan'
+            ],
+            'Nilai': [
+                len(df_export),
+                peserta_sum,
+                jam_sum,
+                peserta_mean,
+                bulan_terbanyak
+            ]
+        }
+        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Ringkasan', index=False)
+        
+        # Sheet 3: Statistik per Penyedia
+        if 'Penyelenggara' in cols_set:
+            # Kode category (kategori sudah terurut) + bincount sebagai pengganti groupby().agg()
+            penyelenggara = df['Penyelenggara']
+            if not isinstance(penyelenggara.dtype, pd.CategoricalDtype):
+                penyelenggara = penyelenggara.astype('category')
+            codes = penyelenggara.cat.codes.to_numpy()
+            valid = codes >= 0
+            codes = codes[valid]
+            n_penyedia = len(penyelenggara.cat.categories)
+            # Hanya penyedia yang muncul di data terfilter
+            observed = np.bincount(codes, minlength=n_penyedia) > 0
+            
+            def total_per_penyedia(values):
+                if not pd.api.types.is_numeric_dtype(values):
+                    values = pd.to_numeric(values, errors='coerce')
+                weights = values.fillna(0).to_numpy()[valid]
+                return np.bincount(codes, weights=weights, minlength=n_penyedia)[observed]
+            
+            penyedia_stats = pd.DataFrame({
+                'Penyelenggara': penyelenggara.cat.categories[observed],
+                'Jumlah Pelatihan': total_per_penyedia(df['NamaProgramPembelajaran'].notna()).astype(int),
+                'Total Peserta': total_per_penyedia(df['TotalPeserta']).astype(int),
+                'Total Jam Lator': total_per_penyedia(df['TotalJamlator']).astype(int)
+            })
+            penyedia_stats.to_excel(writer, sheet_name='Statistik Penyedia', index=False)
+    
+    # getvalue() menyerahkan buffer internal BytesIO (tanpa salinan ekstra);
+    # bytes(getbuffer()) justru selalu menyalin
+    return output.getvalue()
+
 @app.callback(
     Output("download-excel", "data"),
     Input("export-excel-btn", "n_clicks"),
@@ -766,111 +1185,35 @@ def export_to_excel(n_clicks, data_dict, bulan_filter, penyelenggara_filter, met
         return dash.no_update
     
     try:
-        print(f"Memulai ekspor Excel... (klik ke-{n_clicks})")
+        logger.info("Memulai ekspor Excel... (klik ke-%s)", n_clicks)
         
         # Konversi data
         if not data_dict:
-            print("Data kosong")
+            logger.info("Data kosong")
             return None
         
-        df = pd.DataFrame(data_dict)
-        
-        if df.empty:
-            print("DataFrame kosong")
+        # Normalisasi filter sama dengan callback dashboard (tuple terurut, hashable)
+        content = build_export_bytes(
+            store_key(data_dict),
+            *filter_keys(bulan_filter, penyelenggara_filter, metode_filter)
+        )
+        if content is None:
             return None
         
-        # Apply filter with same like dash
-        if bulan_filter:
-            df = df[df['Bulan_Indo'].isin(bulan_filter)]
-        
-        if penyelenggara_filter:
-            df = df[df['Penyelenggara'].astype(str).isin(penyelenggara_filter)]
-        
-        if metode_filter:
-            df = df[df['Metode'].astype(str).isin(metode_filter)]
-        
-        print(f"📊 Data untuk ekspor: {len(df)} baris")
-        
-        # 3. Pilih kolom untuk ekspor
-        column_order = [
-            'NamaProgramPembelajaran', 'Mulai', 'Akhir', 'Durasi',
-            'Metode', 'Penyelenggara', 'TotalPeserta', 'Jumlahkelas',
-            'Bulan_Indo', 'TotalJamlator', 'Tahun'
-        ]
-        
-        # Hanya ambil kolom yang ada
-        existing_cols = [col for col in column_order if col in df.columns]
-        df_export = df[existing_cols].copy()
-        
-        # Format data
-        # Tanggal
-        for col in ['Mulai', 'Akhir']:
-            if col in df_export.columns:
-                df_export[col] = pd.to_datetime(df_export[col], errors='coerce')
-                df_export[col] = df_export[col].dt.strftime('%d/%m/%Y')
-        
-        # Numerik
-        for col in ['TotalPeserta', 'TotalJamlator']:
-            if col in df_export.columns:
-                df_export[col] = pd.to_numeric(df_export[col], errors='coerce')
-                df_export[col] = df_export[col].fillna(0).astype(int)
-                # Format dengan pemisah ribuan
-                df_export[col] = df_export[col].apply(lambda x: f"{x:,}")
-        
-        # Buat Excel di memory
-        output = io.BytesIO()
-        
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Sheet 1: Data Pelatihan
-            df_export.to_excel(writer, sheet_name='Data Pelatihan', index=False)
-            
-            # Sheet 2: Ringkasan
-            summary_data = {
-                'Metrik': [
-                    'Total Pelatihan',
-                    'Total Peserta', 
-                    'Total Jam Lator',
-                    'Rata-rata Peserta per Pelatihan',
-                    'Pelatihan Terbanyak di Bulan'
-                ],
-                'Nilai': [
-                    len(df_export),
-                    df['TotalPeserta'].sum() if 'TotalPeserta' in df.columns else 0,
-                    df['TotalJamlator'].sum() if 'TotalJamlator' in df.columns else 0,
-                    round(df['TotalPeserta'].mean(), 1) if 'TotalPeserta' in df.columns else 0,
-                    df['Bulan_Indo'].mode()[0] if 'Bulan_Indo' in df.columns and not df.empty else '-'
-                ]
-            }
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Ringkasan', index=False)
-            
-            # Sheet 3: Statistik per Penyedia
-            if 'Penyelenggara' in df.columns:
-                penyedia_stats = df.groupby('Penyelenggara').agg({
-                    'NamaProgramPembelajaran': 'count',
-                    'TotalPeserta': 'sum',
-                    'TotalJamlator': 'sum'
-                }).reset_index()
-                penyedia_stats.columns = ['Penyelenggara', 'Jumlah Pelatihan', 'Total Peserta', 'Total Jam Lator']
-                pd.DataFrame(penyedia_stats).to_excel(writer, sheet_name='Statistik Penyedia', index=False)
-        
-        output.seek(0)
-        
         # 6. Nama file
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"Dashboard_Pelatihan_{timestamp}.xlsx"
         
-        print(f"Ekspor berhasil: {filename}")
+        logger.info("Ekspor berhasil: %s", filename)
         
         return dcc.send_bytes(
-            output.getvalue(),
+            content,
             filename=filename,
             type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
         
     except Exception as e:
-        print(f"Error saat ekspor: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error saat ekspor: %s", e)
         return None
 
 @app.callback(
@@ -883,7 +1226,7 @@ def show_export_status(n_clicks, data_dict):
     """Tampilkan status ekspor"""
     if n_clicks and n_clicks > 0:
         if data_dict:
-            df = pd.DataFrame(data_dict)
+            df = load_store(store_key(data_dict))
             return f"Sedang mengekspor {len(df)} data..."
     return ""
 
@@ -901,10 +1244,12 @@ if __name__ == "__main__":
         print(f" URL: {GOOGLE_DRIVE_URL}")
     else:
         print("Sumber: File Lokal (kalpem.csv)")
-    print(f"Backup: {BACKUP_FILE}, {CSV_BACKUP}")
+    print(f"Backup: {CSV_BACKUP}")
     print(" Fitur: Mode Gelap/Terang • Ekspor Excel • Filter")
     print("="*60)
     print(" Buka browser dan akses: http://localhost:8050")
+    print(" Produksi: gunicorn -c gunicorn_conf.py app:server")
     print("="*60)
     
-    app.run_server(debug=True, port=8050, host='0.0.0.0')
\ No newline at end of file
+    # Debug/reloader hanya untuk pengembangan (DEV=1); reloader meng-import app dua kali
+    app.run_server(debug=bool(os.getenv('DEV')), port=8050, host='0.0.0.0')
\ No newline at end of file
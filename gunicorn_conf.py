@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+Konfigurasi gunicorn untuk Dashboard Pelatihan
+Jalankan: gunicorn -c gunicorn_conf.py app:server
+"""
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8050")
+
+# Satu proses saja: data terbaru dan refresher latar belakang hidup di memori
+# proses (app._latest). Beberapa worker berarti beberapa unduhan Drive per
+# interval, versi data yang berbeda per worker, dan cache payload yang selalu miss.
+workers = 1
+
+# Konkurensi lewat thread: ekspor Excel tidak mengantre di belakang callback dashboard
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+timeout = 120
+
+# Batasi thread pustaka numerik agar tidak oversubscription dengan thread worker
+raw_env = [
+    "OMP_NUM_THREADS=1",
+    "OPENBLAS_NUM_THREADS=1",
+    "MKL_NUM_THREADS=1",
+]